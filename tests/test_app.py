@@ -1,114 +1,92 @@
+"""
+Tests for the Mergington High School API.
+
+Assertions here are simple comparisons, so pytest's assertion rewriting is
+disabled for this module: PYTEST_DONT_REWRITE
+"""
+
+import asyncio
+import copy
+
+import httpx
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-import sys
-from pathlib import Path
 
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from app import (
+    app,
+    activities as _live_activities,
+    signup_for_activity,
+    unregister_from_activity,
+)
 
-from app import app
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+    """Create a single test client shared across the test session"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def root_response(client):
+    """Fetch the root redirect once; its target is fixed when the app is built"""
+    return client.get("/", follow_redirects=False)
+
+
+async def _send_concurrently(method, url, emails):
+    """Issue one request per email concurrently, passing the email as a query param"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        send = getattr(ac, method)
+        return await asyncio.gather(
+            *(send(url, params={"email": email}) for email in emails)
+        )
+
+
+# Snapshot of the activities as defined by the app, taken once at import
+_PRISTINE = copy.deepcopy(_live_activities)
+
+# Kept independent of the app so a dropped or added activity is caught
+_EXPECTED_ACTIVITIES = frozenset({
+    "Basketball Team",
+    "Soccer Club",
+    "Art Club",
+    "Drama Society",
+    "Mathletes",
+    "Science Club",
+    "Chess Club",
+    "Programming Class",
+    "Gym Class",
+})
 
 
 @pytest.fixture
 def reset_activities():
     """Reset activities to initial state before each test"""
-    from app import activities
-    
-    # Store original state
-    original_activities = {
-        "Basketball Team": {
-            "description": "Join the school basketball team for training and competitions",
-            "schedule": "Mondays and Thursdays, 4:00 PM - 6:00 PM",
-            "max_participants": 15,
-            "participants": []
-        },
-        "Soccer Club": {
-            "description": "Practice soccer skills and play friendly matches",
-            "schedule": "Wednesdays, 3:30 PM - 5:30 PM",
-            "max_participants": 18,
-            "participants": []
-        },
-        "Art Club": {
-            "description": "Explore painting, drawing, and other visual arts",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 16,
-            "participants": []
-        },
-        "Drama Society": {
-            "description": "Participate in acting, stage production, and school plays",
-            "schedule": "Fridays, 4:00 PM - 6:00 PM",
-            "max_participants": 20,
-            "participants": []
-        },
-        "Mathletes": {
-            "description": "Compete in math competitions and solve challenging problems",
-            "schedule": "Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 10,
-            "participants": []
-        },
-        "Science Club": {
-            "description": "Conduct experiments and explore scientific concepts",
-            "schedule": "Wednesdays, 4:00 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": []
-        },
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": []
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": []
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": []
-        }
-    }
-    
-    # Clear and reset
-    activities.clear()
-    activities.update(original_activities)
-    
+    _live_activities.clear()
+    _live_activities.update(copy.deepcopy(_PRISTINE))
+
     yield
-    
-    # Reset after test
-    activities.clear()
-    activities.update(original_activities)
 
 
 class TestRoot:
-    def test_root_redirects_to_static(self, client):
+    def test_root_redirects_to_static(self, root_response):
         """Test that root endpoint redirects to static/index.html"""
-        response = client.get("/", follow_redirects=False)
-        assert response.status_code == 307
-        assert response.headers["location"] == "/static/index.html"
+        assert root_response.status_code == 307
+        assert root_response.headers["location"] == "/static/index.html"
 
 
 class TestGetActivities:
-    def test_get_activities_returns_all_activities(self, client, reset_activities):
+    def test_get_activities_returns_all_activities(self, client):
         """Test that GET /activities returns all activities"""
         response = client.get("/activities")
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, dict)
-        assert len(data) == 9
-        assert "Basketball Team" in data
-        assert "Soccer Club" in data
+        assert data.keys() == _EXPECTED_ACTIVITIES
 
-    def test_get_activities_has_correct_structure(self, client, reset_activities):
+    def test_get_activities_has_correct_structure(self, client):
         """Test that activities have the correct structure"""
         response = client.get("/activities")
         data = response.json()
@@ -120,68 +98,68 @@ class TestGetActivities:
         assert isinstance(activity["participants"], list)
 
 
+class TestNonexistentActivity:
+    @pytest.mark.parametrize(
+        "handler",
+        [signup_for_activity, unregister_from_activity],
+        ids=["signup", "unregister"],
+    )
+    def test_nonexistent_activity(self, handler):
+        """Test signing up for or unregistering from a non-existent activity"""
+        with pytest.raises(HTTPException) as exc_info:
+            handler("NonExistent", "test@mergington.edu")
+
+        assert exc_info.value.status_code == 404
+        assert "not found" in exc_info.value.detail.lower()
+
+
 class TestSignup:
     def test_signup_new_participant(self, client, reset_activities):
         """Test signing up a new participant to an activity"""
         email = "student@mergington.edu"
         activity = "Basketball Team"
-        
+
         response = client.post(
-            f"/activities/{activity}/signup?email={email}"
+            f"/activities/{activity}/signup", params={"email": email}
         )
-        
+
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
         assert email in data["message"]
-        
-        # Verify participant was added
-        activities_response = client.get("/activities")
-        activities = activities_response.json()
-        assert email in activities[activity]["participants"]
 
-    def test_signup_nonexistent_activity(self, client, reset_activities):
-        """Test signing up for a non-existent activity"""
-        response = client.post(
-            "/activities/NonExistent/signup?email=test@mergington.edu"
-        )
-        
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"].lower()
+        # Verify participant was added
+        assert email in _live_activities[activity]["participants"]
 
-    def test_signup_duplicate_participant(self, client, reset_activities):
+    def test_signup_duplicate_participant(self, reset_activities):
         """Test that a student cannot sign up twice for the same activity"""
         email = "student@mergington.edu"
         activity = "Basketball Team"
-        
+
         # First signup
-        response1 = client.post(
-            f"/activities/{activity}/signup?email={email}"
-        )
-        assert response1.status_code == 200
-        
+        signup_for_activity(activity, email)
+
         # Second signup - should fail
-        response2 = client.post(
-            f"/activities/{activity}/signup?email={email}"
-        )
-        
-        assert response2.status_code == 400
-        assert "already signed up" in response2.json()["detail"].lower()
+        with pytest.raises(HTTPException) as exc_info:
+            signup_for_activity(activity, email)
 
-    def test_signup_multiple_participants(self, client, reset_activities):
+        assert exc_info.value.status_code == 400
+        assert "already signed up" in exc_info.value.detail.lower()
+        assert _live_activities[activity]["participants"].count(email) == 1
+
+    def test_signup_multiple_participants(self, reset_activities):
         """Test adding multiple participants to the same activity"""
         activity = "Soccer Club"
         emails = ["student1@mergington.edu", "student2@mergington.edu", "student3@mergington.edu"]
-        
-        for email in emails:
-            response = client.post(
-                f"/activities/{activity}/signup?email={email}"
-            )
+
+        responses = asyncio.run(_send_concurrently(
+            "post", f"/activities/{activity}/signup", emails
+        ))
+        for response in responses:
             assert response.status_code == 200
-        
+
         # Verify all were added
-        activities_response = client.get("/activities")
-        participants = activities_response.json()[activity]["participants"]
+        participants = _live_activities[activity]["participants"]
         assert len(participants) == 3
         for email in emails:
             assert email in participants
@@ -192,68 +170,52 @@ class TestUnregister:
         """Test unregistering a participant from an activity"""
         email = "student@mergington.edu"
         activity = "Basketball Team"
-        
+
         # First, sign up
-        client.post(
-            f"/activities/{activity}/signup?email={email}"
-        )
-        
+        signup_for_activity(activity, email)
+
         # Verify they're registered
-        activities_response = client.get("/activities")
-        assert email in activities_response.json()[activity]["participants"]
-        
+        assert email in _live_activities[activity]["participants"]
+
         # Now unregister
         response = client.delete(
-            f"/activities/{activity}/unregister?email={email}"
+            f"/activities/{activity}/unregister", params={"email": email}
         )
-        
+
         assert response.status_code == 200
         data = response.json()
         assert "message" in data
         assert email in data["message"]
-        
-        # Verify they're removed
-        activities_response = client.get("/activities")
-        assert email not in activities_response.json()[activity]["participants"]
 
-    def test_unregister_nonexistent_activity(self, client, reset_activities):
-        """Test unregistering from a non-existent activity"""
-        response = client.delete(
-            "/activities/NonExistent/unregister?email=test@mergington.edu"
-        )
-        
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"].lower()
+        # Verify they're removed
+        assert email not in _live_activities[activity]["participants"]
 
-    def test_unregister_not_registered_participant(self, client, reset_activities):
+    def test_unregister_not_registered_participant(self, reset_activities):
         """Test unregistering someone not registered"""
-        response = client.delete(
-            "/activities/Basketball Team/unregister?email=notregistered@mergington.edu"
-        )
-        
-        assert response.status_code == 400
-        assert "not registered" in response.json()["detail"].lower()
+        with pytest.raises(HTTPException) as exc_info:
+            unregister_from_activity("Basketball Team", "notregistered@mergington.edu")
 
-    def test_unregister_multiple_participants(self, client, reset_activities):
+        assert exc_info.value.status_code == 400
+        assert "not registered" in exc_info.value.detail.lower()
+
+    def test_unregister_multiple_participants(self, reset_activities):
         """Test unregistering multiple participants"""
         activity = "Soccer Club"
         emails = ["student1@mergington.edu", "student2@mergington.edu", "student3@mergington.edu"]
-        
+
         # Sign up all
-        for email in emails:
-            client.post(
-                f"/activities/{activity}/signup?email={email}"
-            )
-        
+        asyncio.run(_send_concurrently(
+            "post", f"/activities/{activity}/signup", emails
+        ))
+
         # Unregister the first two
-        for email in emails[:2]:
-            response = client.delete(
-                f"/activities/{activity}/unregister?email={email}"
-            )
+        responses = asyncio.run(_send_concurrently(
+            "delete", f"/activities/{activity}/unregister", emails[:2]
+        ))
+        for response in responses:
             assert response.status_code == 200
-        
+
         # Verify only one remains
-        activities_response = client.get("/activities")
-        participants = activities_response.json()[activity]["participants"]
+        participants = _live_activities[activity]["participants"]
         assert len(participants) == 1
         assert emails[2] in participants